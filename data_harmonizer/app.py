@@ -5,8 +5,10 @@ import os
 # Ensure the project root is in path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from core.jobs import get_runner
 from ui.state import SessionManager
 from ui.wizard import (
+    render_active_job,
     render_upload_step,
     render_pivot_check,
     render_schema_selector,
@@ -20,11 +22,20 @@ st.set_page_config(
     layout="centered"
 )
 
+@st.cache_resource
+def warm_up_workers():
+    """Starts and preloads the job workers once per server process."""
+    get_runner().warm_up()
+
 def main():
     st.title("🧬 Data Harmonizer")
     st.caption("ETL Last Mile Assistant | Unify disparate data sources with ease.")
     st.divider()
 
+    # Optional cold-start warm-up (enabled by run_app.sh and the Docker image)
+    if os.environ.get('DH_WARMUP') == '1':
+        warm_up_workers()
+
     # Initialize Session
     session = SessionManager()
     
@@ -43,6 +54,9 @@ def main():
         st.markdown(f"**Step {step}/4: {steps.get(step, 'Unknown')}**")
         st.progress(step / 4)
         
+        # Heavy stages run as background jobs; poll (or resume) the session's job first
+        render_active_job(session)
+        
         # Wizard Flow Orchestration
         if step == 1:
             render_upload_step(session)
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from io import BytesIO
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from core.preview import to_arrow_table
+from core.transformation import merge_datasets
+
+# Parquet schema metadata key holding the pivot and the dataset list
+METADATA_KEY = b'data_harmonizer'
+
+# Prefix of the hidden per-dataset provenance columns (True if the row's key came from that dataset)
+SOURCE_PREFIX = '__dh_source__'
+
+# (name, content hash, loaded frame)
+Dataset = Tuple[str, str, pd.DataFrame]
+
+
+def content_hash(content: bytes) -> str:
+    """
+    Returns the hash identifying a source file's content.
+
+    Args:
+        content: The raw bytes of the uploaded file.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def _output_names(pivot_column: str, datasets: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Reproduces merge_datasets' column naming for an ordered list of datasets.
+
+    A column keeps its name unless it already exists in the merged result, in which
+    case it gets the '_file{position}' suffix.
+
+    Returns:
+        List[List[str]]: For each dataset, the output names of its non-pivot columns.
+    """
+    taken = {pivot_column}
+    names = []
+    for position, entry in enumerate(datasets, start=1):
+        dataset_names = [col if col not in taken else f"{col}_file{position}" for col in entry['columns']]
+        taken.update(dataset_names)
+        names.append(dataset_names)
+    return names
+
+
+def _ordered_columns(pivot_column: str, datasets: List[Dict[str, Any]]) -> List[str]:
+    """Returns the column layout of a result: pivot, dataset columns, provenance."""
+    columns = [pivot_column] + [col for names in _output_names(pivot_column, datasets) for col in names]
+    return columns + [SOURCE_PREFIX + entry['name'] for entry in datasets]
+
+
+class HarmonizedResult:
+    """
+    A merged result together with what is needed to update it incrementally.
+
+    Besides the merged data it records the pivot, the ordered list of source
+    datasets (name, content hash, original columns) and, per row, which datasets
+    contributed the row's key. New or changed datasets can then be merged into the
+    result without re-reading or re-joining the unchanged ones.
+    """
+
+    def __init__(self, frame: pd.DataFrame, pivot_column: str, datasets: List[Dict[str, Any]]):
+        """
+        Args:
+            frame: Merged data plus the SOURCE_PREFIX provenance columns.
+            pivot_column: The column the datasets were joined on.
+            datasets: Ordered entries with 'name', 'hash' and 'columns' keys.
+        """
+        self._frame = frame
+        self.pivot_column = pivot_column
+        self.datasets = datasets
+
+    @classmethod
+    def build(
+        cls,
+        datasets: List[Dataset],
+        pivot_column: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> 'HarmonizedResult':
+        """
+        Merges datasets from scratch and records their provenance.
+
+        Args:
+            datasets: Ordered (name, content hash, frame) triples.
+            pivot_column: The common column name to join on.
+            progress_callback: Forwarded to merge_datasets.
+
+        Returns:
+            HarmonizedResult: The new result.
+        """
+        frame = merge_datasets([df for _, _, df in datasets], pivot_column, progress_callback=progress_callback)
+        if not datasets:
+            return cls(frame, pivot_column, [])
+
+        sources = {
+            SOURCE_PREFIX + name: frame[pivot_column].isin(df[pivot_column])
+            for name, _, df in datasets
+        }
+        frame = pd.concat([frame, pd.DataFrame(sources, index=frame.index)], axis=1)
+        entries = [
+            {'name': name, 'hash': digest, 'columns': [col for col in df.columns if col != pivot_column]}
+            for name, digest, df in datasets
+        ]
+        return cls(frame[_ordered_columns(pivot_column, entries)], pivot_column, entries)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """The merged data, without provenance columns."""
+        return self._frame.drop(columns=[SOURCE_PREFIX + entry['name'] for entry in self.datasets])
+
+    def is_known(self, digest: str) -> bool:
+        """Returns True if a dataset with this content hash is already merged."""
+        return any(entry['hash'] == digest for entry in self.datasets)
+
+    def update(self, datasets: List[Dataset]) -> Tuple['HarmonizedResult', Dict[str, List[str]]]:
+        """
+        Merges new or changed datasets into the result.
+
+        Datasets whose content hash is already known are skipped. A dataset whose
+        name is known but whose hash differs replaces the previous version: its
+        columns are dropped, keys only it contributed are removed, and the new
+        version is joined back in at the same position. Unknown names are appended.
+        Only the affected dataset's columns are joined; other columns are renamed
+        if needed so the output matches a full rebuild of the same datasets. This
+        requires a unique pivot; duplicated keys are rejected.
+
+        Args:
+            datasets: (name, content hash, frame) triples.
+
+        Returns:
+            Tuple[HarmonizedResult, Dict[str, List[str]]]: The updated result (this one
+            is not modified) and the dataset names under 'added', 'replaced' and 'unchanged'.
+
+        Raises:
+            ValueError: If a dataset lacks the pivot column, or the pivot is not unique
+                in the result or in a dataset (a full rebuild is needed).
+        """
+        pivot = self.pivot_column
+        frame = self._frame
+        entries = [dict(entry) for entry in self.datasets]
+        summary: Dict[str, List[str]] = {'added': [], 'replaced': [], 'unchanged': []}
+
+        for name, digest, df in datasets:
+            if any(entry['hash'] == digest for entry in entries):
+                summary['unchanged'].append(name)
+                continue
+            if pivot not in df.columns:
+                raise ValueError(f"Pivot column '{pivot}' missing in dataset '{name}'.")
+            # With repeated keys the joins multiply rows, and dropping a dataset's
+            # columns cannot undo that; only a full rebuild gives the right result
+            if not frame[pivot].is_unique or not df[pivot].is_unique:
+                raise ValueError(
+                    f"Pivot column '{pivot}' has duplicate values in the previous result or in "
+                    f"dataset '{name}'. Incremental updates need a unique pivot; run a full rebuild instead."
+                )
+
+            entry = {'name': name, 'hash': digest, 'columns': [col for col in df.columns if col != pivot]}
+            names_before = _output_names(pivot, entries)
+            positions = [i for i, existing in enumerate(entries) if existing['name'] == name]
+
+            if positions:
+                position = positions[0]
+                source_col = SOURCE_PREFIX + name
+                frame = frame.drop(columns=names_before[position] + [source_col])
+                remaining_sources = [SOURCE_PREFIX + e['name'] for e in entries if e['name'] != name]
+                if remaining_sources:
+                    frame = frame[frame[remaining_sources].any(axis=1)]
+                else:
+                    frame = frame.iloc[0:0]
+                entries[position] = entry
+                summary['replaced'].append(name)
+            else:
+                position = len(entries)
+                entries.append(entry)
+                names_before.append([])
+                summary['added'].append(name)
+
+            names_after = _output_names(pivot, entries)
+
+            # Other datasets' columns may gain or lose a suffix when this one changes
+            renames = {
+                old: new
+                for i in range(len(entries)) if i != position
+                for old, new in zip(names_before[i], names_after[i]) if old != new
+            }
+            frame = frame.rename(columns=renames)
+
+            incoming = df.rename(columns=dict(zip(entry['columns'], names_after[position])))
+            frame = pd.merge(frame, incoming, on=pivot, how='outer')
+
+            for existing in entries:
+                source_col = SOURCE_PREFIX + existing['name']
+                if existing is entry:
+                    frame[source_col] = frame[pivot].isin(df[pivot])
+                else:
+                    # Rows introduced by the incoming dataset have no flag yet
+                    frame[source_col] = frame[source_col].eq(True)
+
+            frame = frame[_ordered_columns(pivot, entries)].reset_index(drop=True)
+
+        return HarmonizedResult(frame, pivot, entries), summary
+
+    def to_parquet(self, destination: Union[str, BinaryIO]) -> None:
+        """
+        Persists the result, its provenance and metadata as a Parquet file.
+
+        Columns with mixed object types are stored as strings.
+
+        Args:
+            destination: File path or writable binary buffer.
+        """
+        table = to_arrow_table(self._frame)
+        metadata = {'pivot_column': self.pivot_column, 'datasets': self.datasets}
+        table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+        pq.write_table(table, destination)
+
+    def to_parquet_bytes(self) -> bytes:
+        """Returns the Parquet serialization of the result."""
+        buffer = BytesIO()
+        self.to_parquet(buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_parquet(cls, source: Union[str, BinaryIO]) -> 'HarmonizedResult':
+        """
+        Loads a result written by to_parquet.
+
+        Args:
+            source: File path or readable binary buffer.
+
+        Returns:
+            HarmonizedResult: The loaded result.
+
+        Raises:
+            ValueError: If the file is not valid Parquet or lacks harmonizer metadata.
+        """
+        try:
+            table = pq.read_table(source)
+        except (pa.ArrowInvalid, OSError) as e:
+            raise ValueError(f"Invalid Parquet result: {str(e)}")
+
+        raw_metadata = (table.schema.metadata or {}).get(METADATA_KEY)
+        if raw_metadata is None:
+            raise ValueError("Parquet file was not produced by Data Harmonizer (missing metadata).")
+
+        metadata = json.loads(raw_metadata)
+        return cls(table.to_pandas(), metadata['pivot_column'], metadata['datasets'])
@@ -46,13 +46,39 @@ class JsonLoader(BaseLoader):
     # Common keys used in Scale AI and other tools to wrap the list of records
     RECORD_PATH_CANDIDATES = ['tasks', 'items', 'annotations', 'response', 'records', 'data']
 
+    def __init__(self, record_path: Optional[str] = None):
+        """
+        Args:
+            record_path: Key holding the list of records. If omitted, it is detected heuristically.
+        """
+        self.record_path = record_path
+
     def load(self, file_content: BytesIO, filename: str) -> pd.DataFrame:
+        return self.normalize(self.parse(file_content, filename))
+
+    def parse(self, file_content: BytesIO, filename: str) -> Any:
+        """
+        Parses the JSON document without flattening it.
+
+        Raises:
+            ValueError: If the content is not valid JSON.
+        """
         try:
-            data = json.load(file_content)
+            return json.load(file_content)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in {filename}: {str(e)}")
 
-        record_path = self._detect_record_path(data)
+    def normalize(self, data: Any) -> pd.DataFrame:
+        """
+        Flattens already parsed JSON into a DataFrame.
+
+        Args:
+            data: The parsed JSON document.
+
+        Returns:
+            pd.DataFrame: The flattened records.
+        """
+        record_path = self.resolve_record_path(data)
         
         if record_path:
             # If a record path is found, use json_normalize to flatten and propagate metadata
@@ -69,6 +95,14 @@ class JsonLoader(BaseLoader):
                 
         return df
 
+    def resolve_record_path(self, data: Any) -> Optional[str]:
+        """
+        Returns the configured record path if it applies to data, else the detected one.
+        """
+        if self.record_path is not None and isinstance(data, dict) and isinstance(data.get(self.record_path), list):
+            return self.record_path
+        return self._detect_record_path(data)
+
     def _detect_record_path(self, data: Dict[str, Any]) -> Optional[str]:
         """
         Heuristically detects the key containing the main list of records.
@@ -94,3 +128,22 @@ class JsonLoader(BaseLoader):
                     longest_list_key = key
         
         return longest_list_key
+
+
+def get_loader(filename: str) -> Optional[BaseLoader]:
+    """
+    Selects the loader strategy matching a file's extension.
+
+    Args:
+        filename: The name of the uploaded file.
+
+    Returns:
+        Optional[BaseLoader]: A loader instance, or None if the extension is not supported.
+    """
+    if filename.endswith('.csv'):
+        return CsvLoader()
+    if filename.endswith(('.xlsx', '.xls')):
+        return ExcelLoader()
+    if filename.endswith('.json'):
+        return JsonLoader()
+    return None
@@ -0,0 +1,516 @@
+import os
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+# pandas and the core stages are imported inside the tasks: they run in workers,
+# and keeping them out of this module keeps the Streamlit entry point light.
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.incremental import HarmonizedResult
+    from core.registry import SchemaRegistry
+    from core.preview import ResultView
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when the job has been cancelled by the user."""
+
+
+class JobStatus:
+    """Lifecycle states of a background job."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+
+class JobContext:
+    """
+    Handle given to a task running in a worker process.
+
+    It reports progress back to the registry and lets the task observe
+    cancellation requests between units of work.
+    """
+
+    def __init__(self, job_id: str, progress: Any, cancelled: Any):
+        self.job_id = job_id
+        self._progress = progress
+        self._cancelled = cancelled
+
+    def report(self, fraction: float, message: str = "") -> None:
+        """
+        Publishes the current progress of the job.
+
+        Args:
+            fraction: Completed fraction between 0.0 and 1.0.
+            message: Short human readable description of the current step.
+
+        Raises:
+            JobCancelled: If cancellation was requested for this job.
+        """
+        self._progress[self.job_id] = (min(max(fraction, 0.0), 1.0), message)
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        """
+        Raises:
+            JobCancelled: If cancellation was requested for this job.
+        """
+        if self._cancelled.get(self.job_id, False):
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+
+
+class _JobRecord:
+    """Registry entry for a submitted job."""
+
+    def __init__(self, job_id: str, stage: str, future: Future):
+        self.job_id = job_id
+        self.stage = stage
+        self.future = future
+        self.finished_at: Optional[float] = None
+        future.add_done_callback(self._mark_finished)
+
+    def _mark_finished(self, future: Future) -> None:
+        self.finished_at = time.monotonic()
+
+
+class JobRunner:
+    """
+    Local process pool with a job registry.
+
+    Heavy stages (ingestion, merge, export) are submitted here so they run outside
+    the Streamlit script thread. Jobs are addressed by id, so a session can poll,
+    cancel or pick up a finished result after a rerun or browser refresh.
+    The runner is shared by every session of the server process; finished jobs
+    nobody collected (e.g. the tab was closed) are evicted after a TTL.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, result_ttl: Optional[float] = None):
+        """
+        Args:
+            max_workers: Size of the process pool. Defaults to the DH_MAX_WORKERS
+                environment variable, or the executor default if unset.
+            result_ttl: Seconds a finished job is kept before eviction. Defaults to the
+                DH_JOB_TTL environment variable, or one hour.
+        """
+        if max_workers is None and os.environ.get('DH_MAX_WORKERS'):
+            max_workers = int(os.environ['DH_MAX_WORKERS'])
+        if result_ttl is None:
+            result_ttl = float(os.environ.get('DH_JOB_TTL') or 3600)
+        self._max_workers = max_workers
+        self._result_ttl = result_ttl
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+        self._jobs: Dict[str, _JobRecord] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        # Pool and manager are created lazily so importing this module stays cheap.
+        # Workers are not forked from the (multi-threaded) Streamlit server, which
+        # can deadlock; _init_worker preloads what they need instead.
+        if self._manager is None or not self._manager._process.is_alive():
+            self._manager = _mp_context().Manager()
+            self._progress = self._manager.dict()
+            self._cancelled = self._manager.dict()
+        if self._executor is not None and self._executor._broken:
+            # A worker died (e.g. killed for memory); the pool cannot run anything else
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=_mp_context(), initializer=_init_worker
+            )
+
+    def submit(self, stage: str, fn: Callable[..., Any], *args: Any) -> str:
+        """
+        Submits a task to the process pool.
+
+        Finished jobs older than the result TTL are evicted first. If a worker
+        died, the broken pool is replaced so later jobs still run.
+
+        Args:
+            stage: Name of the wizard stage the job belongs to (e.g. 'load', 'merge').
+            fn: Module-level callable invoked as fn(context, *args) in a worker.
+            *args: Picklable arguments forwarded to fn.
+
+        Returns:
+            str: The id of the new job.
+        """
+        self.evict_expired()
+        with self._lock:
+            self._ensure_started()
+            job_id = uuid.uuid4().hex
+            self._progress[job_id] = (0.0, "Queued")
+            context = JobContext(job_id, self._progress, self._cancelled)
+            try:
+                future = self._executor.submit(fn, context, *args)
+            except BrokenProcessPool:
+                # The pool broke after the check in _ensure_started
+                self._ensure_started()
+                future = self._executor.submit(fn, context, *args)
+            self._jobs[job_id] = _JobRecord(job_id, stage, future)
+        return job_id
+
+    def warm_up(self) -> None:
+        """
+        Starts the worker pool ahead of the first job.
+
+        Each worker preloads pandas and the parsers in its initializer, so the
+        first user after a cold start does not pay for those imports. Returns
+        immediately; the warm-up tasks are not registered as jobs.
+        """
+        with self._lock:
+            self._ensure_started()
+            for _ in range(self._max_workers or os.cpu_count() or 1):
+                self._executor.submit(_noop)
+
+    def _get(self, job_id: str) -> _JobRecord:
+        record = self._jobs.get(job_id)
+        if record is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        return record
+
+    def has_job(self, job_id: str) -> bool:
+        """Returns True if the job id is known to the registry."""
+        return job_id in self._jobs
+
+    def stage(self, job_id: str) -> str:
+        """Returns the stage name the job was submitted for."""
+        return self._get(job_id).stage
+
+    def status(self, job_id: str) -> str:
+        """
+        Returns the current JobStatus value of a job.
+
+        Raises:
+            KeyError: If the job id is unknown.
+        """
+        future = self._get(job_id).future
+        if future.cancelled():
+            return JobStatus.CANCELLED
+        if not future.done():
+            return JobStatus.RUNNING if future.running() else JobStatus.PENDING
+        if self._cancelled.get(job_id, False):
+            # Stages that cannot be interrupted still finish; their result is dropped
+            return JobStatus.CANCELLED
+        error = future.exception()
+        if isinstance(error, JobCancelled):
+            return JobStatus.CANCELLED
+        if error is not None:
+            return JobStatus.FAILED
+        return JobStatus.DONE
+
+    def progress(self, job_id: str) -> Tuple[float, str]:
+        """Returns the last reported (fraction, message) pair of a job."""
+        if self.status(job_id) == JobStatus.DONE:
+            return 1.0, "Done"
+        return self._progress.get(job_id, (0.0, ""))
+
+    def result(self, job_id: str) -> Any:
+        """
+        Returns the result of a finished job.
+
+        Raises:
+            KeyError: If the job id is unknown.
+            RuntimeError: If the job has not finished successfully.
+        """
+        status = self.status(job_id)
+        if status != JobStatus.DONE:
+            raise RuntimeError(f"Job {job_id} has no result (status: {status}).")
+        return self._get(job_id).future.result()
+
+    def error(self, job_id: str) -> Optional[str]:
+        """Returns the error message of a failed job, or None."""
+        if self.status(job_id) != JobStatus.FAILED:
+            return None
+        return str(self._get(job_id).future.exception())
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Requests cancellation of a job.
+
+        Pending jobs are dropped from the queue; running jobs stop at their next
+        progress report. A job that completes anyway is reported as cancelled and
+        its result is not returned.
+
+        Returns:
+            bool: False if the job had already finished.
+        """
+        record = self._get(job_id)
+        if record.future.done():
+            return False
+        self._cancelled[job_id] = True
+        record.future.cancel()
+        return True
+
+    def discard(self, job_id: str) -> None:
+        """Forgets a job and releases its result. Unknown ids are ignored."""
+        with self._lock:
+            record = self._jobs.pop(job_id, None)
+            if record is not None:
+                if not record.future.done():
+                    # Stop the worker at its next report; drop the flag once it has stopped
+                    self._cancelled[job_id] = True
+                    record.future.cancel()
+                    record.future.add_done_callback(lambda _: self._cancelled.pop(job_id, None))
+                else:
+                    self._cancelled.pop(job_id, None)
+                self._progress.pop(job_id, None)
+
+    def evict_expired(self) -> None:
+        """Discards finished jobs whose result has not been collected within the TTL."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                job_id for job_id, record in self._jobs.items()
+                if record.finished_at is not None and now - record.finished_at > self._result_ttl
+            ]
+        for job_id in expired:
+            self.discard(job_id)
+
+    def shutdown(self) -> None:
+        """Stops the worker pool and the progress manager."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._manager.shutdown()
+                self._executor = None
+                self._manager = None
+            self._jobs.clear()
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """Returns the start method for workers and the manager: forkserver, or spawn where unavailable."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _init_worker() -> None:
+    """Preloads heavy modules in a freshly started worker process."""
+    import pandas  # noqa: F401
+    import core.ingestion  # noqa: F401
+    import core.heuristics  # noqa: F401
+    import core.transformation  # noqa: F401
+    import core.incremental  # noqa: F401
+    import core.registry  # noqa: F401
+
+
+def _noop() -> None:
+    """Placeholder task used to force worker start-up."""
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """Returns the process-wide JobRunner shared by all sessions."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+# --- Wizard stage tasks (module level so they can be pickled to workers) ---
+
+def run_ingestion(
+    context: JobContext, files: List[Tuple[str, bytes]], registry_path: Optional[str] = None
+) -> Tuple[Dict[str, 'pd.DataFrame'], 'pd.DataFrame', Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Loads uploaded files and computes pivot candidates over the Super Schema.
+
+    Layouts found in the schema registry reuse their remembered record path and
+    pivot instead of running the detection heuristics.
+
+    Args:
+        context: Job handle for progress and cancellation.
+        files: List of (filename, raw bytes) pairs.
+        registry_path: Schema registry file; defaults to the configured location.
+
+    Returns:
+        Tuple[Dict[str, pd.DataFrame], pd.DataFrame, Dict[str, str], Dict[str, Dict[str, Any]]]:
+        Loaded frames by filename, the pivot candidates table, the content hash of
+        each file and each file's layout (see _load_files).
+
+    Raises:
+        ValueError: If a file type is unsupported or a file cannot be parsed.
+    """
+    import pandas as pd
+    from core.heuristics import calculate_pivot_score
+    from core.incremental import content_hash
+    from core.registry import SchemaRegistry, known_pivot_candidates
+
+    registry = SchemaRegistry(registry_path)
+    loaded_data, layouts = _load_files(context, files, steps=len(files) + 1, registry=registry)
+
+    context.report(len(files) / (len(files) + 1), "Calculating automated pivot suggestions...")
+    candidates = known_pivot_candidates(registry, list(loaded_data.values()))
+    if candidates is None:
+        if loaded_data:
+            super_df = pd.concat(list(loaded_data.values()), ignore_index=True, sort=False)
+            candidates = calculate_pivot_score(super_df)
+        else:
+            candidates = pd.DataFrame()
+    hashes = {name: content_hash(content) for name, content in files}
+    return loaded_data, candidates, hashes, layouts
+
+
+def _load_files(
+    context: JobContext, files: List[Tuple[str, bytes]], steps: int, registry: Optional['SchemaRegistry'] = None
+) -> Tuple[Dict[str, 'pd.DataFrame'], Dict[str, Dict[str, Any]]]:
+    """
+    Parses (filename, bytes) pairs with the matching loader, reporting one step per file.
+
+    Returns:
+        Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, Any]]]: Loaded frames and, per
+        file, its layout: 'fingerprint' (columns and dtype kinds), 'source_fingerprint' and
+        'loader_options' (JSON record path), and 'known' (True if a remembered record
+        path or pivot applies to it).
+    """
+    from core.ingestion import JsonLoader, get_loader
+    from core.registry import frame_fingerprint, json_fingerprint
+
+    loaded_data = {}
+    layouts = {}
+    for i, (name, content) in enumerate(files):
+        context.report(i / steps, f"Processing {name}...")
+        loader = get_loader(name)
+        if loader is None:
+            raise ValueError(f"Unsupported file type: {name}")
+
+        source_fingerprint = None
+        loader_options = {}
+        known = False
+        if isinstance(loader, JsonLoader):
+            data = loader.parse(BytesIO(content), name)
+            source_fingerprint = json_fingerprint(data)
+            entry = registry.lookup(source_fingerprint) if registry is not None else None
+            remembered_path = (entry or {}).get('loader_options', {}).get('record_path')
+            loader.record_path = remembered_path
+            resolved_path = loader.resolve_record_path(data)
+            # Known only if the remembered path still applied and detection was skipped
+            known = remembered_path is not None and resolved_path == remembered_path
+            loader.record_path = resolved_path
+            loader_options = {'record_path': loader.record_path}
+            df = loader.normalize(data)
+        else:
+            df = loader.load(BytesIO(content), name)
+
+        fingerprint = frame_fingerprint(df)
+        if registry is not None and 'pivot' in (registry.lookup(fingerprint) or {}):
+            known = True
+        loaded_data[name] = df
+        layouts[name] = {
+            'fingerprint': fingerprint,
+            'source_fingerprint': source_fingerprint,
+            'loader_options': loader_options,
+            'known': known,
+        }
+    return loaded_data, layouts
+
+
+def run_merge(
+    context: JobContext, datasets: List[Tuple[str, str, 'pd.DataFrame']], pivot_column: str
+) -> 'HarmonizedResult':
+    """
+    Merges (name, content hash, frame) datasets in a worker, reporting progress after each join.
+
+    Returns:
+        HarmonizedResult: The merged result with the provenance needed for later updates.
+    """
+    from core.incremental import HarmonizedResult
+
+    context.report(0.0, "Merging datasets...")
+
+    def on_progress(done: int, total: int) -> None:
+        context.report(done / total, f"Merged {done}/{total} datasets")
+
+    return HarmonizedResult.build(datasets, pivot_column, progress_callback=on_progress)
+
+
+def run_update(
+    context: JobContext, base: bytes, files: List[Tuple[str, bytes]]
+) -> Tuple['HarmonizedResult', Dict[str, List[str]]]:
+    """
+    Merges new or changed files into a previously exported result.
+
+    Files whose content hash is already part of the result are not parsed.
+
+    Args:
+        context: Job handle for progress and cancellation.
+        base: Parquet bytes produced by HarmonizedResult.to_parquet.
+        files: List of (filename, raw bytes) pairs.
+
+    Returns:
+        Tuple[HarmonizedResult, Dict[str, List[str]]]: The updated result and the
+        added/replaced/unchanged summary.
+
+    Raises:
+        ValueError: If the base result or a file cannot be read, or a file lacks the pivot.
+    """
+    from core.incremental import HarmonizedResult, content_hash
+
+    context.report(0.0, "Reading previous result...")
+    result = HarmonizedResult.from_parquet(BytesIO(base))
+
+    hashed = [(name, content, content_hash(content)) for name, content in files]
+    changed = [(name, content) for name, content, digest in hashed if not result.is_known(digest)]
+    loaded_data, _ = _load_files(context, changed, steps=len(changed) + 1)
+
+    context.report(len(changed) / (len(changed) + 1), "Merging changes...")
+    datasets = [
+        (name, digest, loaded_data[name]) for name, _, digest in hashed if name in loaded_data
+    ]
+    result, summary = result.update(datasets)
+    summary['unchanged'] += [name for name, _, digest in hashed if name not in loaded_data]
+    return result, summary
+
+
+def run_preview(context: JobContext, df: 'pd.DataFrame') -> 'ResultView':
+    """
+    Converts a merged result to Arrow in a worker for the paginated preview.
+
+    Returns:
+        ResultView: The windowed view over df.
+    """
+    from core.preview import ResultView
+
+    context.report(0.0, "Preparing preview...")
+    return ResultView(df)
+
+
+def run_snapshot(context: JobContext, result: 'HarmonizedResult') -> bytes:
+    """
+    Serializes a merged result to Parquet so it can be updated incrementally later.
+
+    Returns:
+        bytes: The .parquet file content.
+    """
+    context.report(0.0, "Writing Parquet snapshot...")
+    return result.to_parquet_bytes()
+
+
+def run_export(context: JobContext, df: 'pd.DataFrame') -> bytes:
+    """
+    Serializes a DataFrame to an Excel workbook in a worker.
+
+    Returns:
+        bytes: The .xlsx file content.
+    """
+    import pandas as pd
+
+    context.report(0.0, "Generating Excel report...")
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Clean Data')
+    return buffer.getvalue()
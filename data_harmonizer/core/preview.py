@@ -0,0 +1,174 @@
+import math
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Any, Dict, List, Optional
+
+
+def _to_arrow_column(series: pd.Series) -> pa.Array:
+    """
+    Converts a pandas column to Arrow, falling back to strings for mixed object columns.
+
+    Args:
+        series: The column to convert.
+
+    Returns:
+        pa.Array: The Arrow representation of the column.
+    """
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed types (e.g. ints and strings after an outer merge) cannot be typed by Arrow
+        values = series.where(series.notna(), None)
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Converts a DataFrame to an Arrow table column by column.
+
+    Columns Arrow cannot type (mixed objects) are stored as strings.
+
+    Args:
+        df: The frame to convert. It is not modified.
+
+    Returns:
+        pa.Table: The table, with column names converted to strings.
+    """
+    arrays = [_to_arrow_column(df.iloc[:, i]) for i in range(len(df.columns))]
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+class ResultView:
+    """
+    Read-only, windowed view over a merged result.
+
+    The DataFrame is converted to an Arrow table once; pages are zero-copy slices
+    of that table, so only the requested window is materialized back to pandas.
+    Per-column summaries are computed on first request and cached on the view.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: The merged result to browse. It is not modified.
+        """
+        self._table = to_arrow_table(df)
+        self.columns: List[str] = list(self._table.column_names)
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def _from_table(cls, table: pa.Table, summaries: Dict[str, Dict[str, Any]]) -> 'ResultView':
+        view = cls.__new__(cls)
+        view.columns = list(table.column_names)
+        view._table = table
+        view._summaries = summaries
+        return view
+
+    def select(self, columns: List[str]) -> 'ResultView':
+        """
+        Returns a view restricted to a subset of columns.
+
+        The Arrow buffers and the already computed summaries are shared, so
+        curating columns does not convert the data again.
+
+        Args:
+            columns: The columns to keep, in order.
+
+        Returns:
+            ResultView: The narrowed view.
+        """
+        table = self._table.select(columns)
+        summaries = {col: self._summaries[col] for col in columns if col in self._summaries}
+        return ResultView._from_table(table, summaries)
+
+    @property
+    def num_rows(self) -> int:
+        return self._table.num_rows
+
+    def num_pages(self, page_size: int) -> int:
+        """Returns the number of pages of page_size rows (at least 1)."""
+        return max(1, math.ceil(self.num_rows / page_size))
+
+    def page(self, page_number: int, page_size: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Materializes one page of rows.
+
+        Args:
+            page_number: Zero-based page index.
+            page_size: Number of rows per page.
+            columns: Optional subset of columns to include.
+
+        Returns:
+            pd.DataFrame: The rows of the page, indexed by their position in the result.
+
+        Raises:
+            ValueError: If page_size is not positive or page_number is out of range.
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be positive.")
+        if not 0 <= page_number < self.num_pages(page_size):
+            raise ValueError(f"Page {page_number} is out of range.")
+
+        offset = page_number * page_size
+        window = self._table.slice(offset, page_size)
+        if columns is not None:
+            window = window.select(columns)
+
+        page_df = window.to_pandas()
+        page_df.index = pd.RangeIndex(offset, offset + len(page_df))
+        return page_df
+
+    def column_summary(self, column: str) -> Dict[str, Any]:
+        """
+        Returns summary statistics for a column, computing them on first use.
+
+        Keys: 'Column', 'Type', 'Null %', 'Distinct', 'Min', 'Max'.
+        Min/Max are None for types without an ordering (e.g. nested lists).
+
+        Raises:
+            KeyError: If the column does not exist.
+        """
+        if column in self._summaries:
+            return self._summaries[column]
+        if column not in self.columns:
+            raise KeyError(f"Unknown column: {column}")
+
+        array = self._table.column(column)
+        null_pct = (array.null_count / self.num_rows * 100) if self.num_rows else 0.0
+
+        try:
+            distinct = pc.count_distinct(array).as_py()
+        except pa.ArrowNotImplementedError:
+            distinct = None
+
+        min_value = max_value = None
+        try:
+            min_max = pc.min_max(array)
+            min_value = min_max['min'].as_py()
+            max_value = min_max['max'].as_py()
+        except pa.ArrowNotImplementedError:
+            pass
+
+        summary = {
+            'Column': column,
+            'Type': str(array.type),
+            'Null %': round(null_pct, 2),
+            'Distinct': distinct,
+            'Min': min_value,
+            'Max': max_value,
+        }
+        self._summaries[column] = summary
+        return summary
+
+    def summaries(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Returns the summaries of several columns as a table.
+
+        Args:
+            columns: The columns to summarize; cached summaries are reused.
+
+        Returns:
+            pd.DataFrame: One row per column.
+        """
+        return pd.DataFrame([self.column_summary(col) for col in columns])
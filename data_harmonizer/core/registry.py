@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+# Serializes read-modify-write cycles of sessions sharing this server process
+_registry_lock = threading.Lock()
+
+
+def default_registry_path() -> str:
+    """
+    Returns the registry location: DH_REGISTRY_PATH, or a file in the user's home directory.
+    """
+    return os.environ.get('DH_REGISTRY_PATH') or os.path.join(
+        os.path.expanduser('~'), '.data_harmonizer', 'schema_registry.json'
+    )
+
+
+def _digest(parts: List[List[str]]) -> str:
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def _dtype_kind(dtype: Any) -> str:
+    """
+    Collapses a dtype to a coarse kind, so inference drift (e.g. an int column
+    read as float64 because of a blank) does not change the fingerprint.
+    """
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return 'timedelta'
+    return 'text'
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Fingerprints a dataset layout by its column names and dtype kinds, in order.
+
+    Dtypes are reduced to numeric/text/datetime/timedelta/bool. Only the schema
+    is read, so the cost is O(columns) regardless of row count.
+
+    Args:
+        df: The loaded dataset.
+
+    Returns:
+        str: Hex digest identifying the layout.
+    """
+    return _digest([[str(col), _dtype_kind(dtype)] for col, dtype in df.dtypes.items()])
+
+
+def selection_fingerprint(pivot_column: str, columns: List[Any]) -> str:
+    """
+    Keys a remembered column selection by the pivot and the merged column names.
+
+    Dtypes are left out: after an outer join they depend on how well the keys
+    overlap, which changes from run to run for the same layouts.
+
+    Args:
+        pivot_column: The pivot the result was merged on.
+        columns: The merged result's column names, in order.
+
+    Returns:
+        str: Hex digest identifying the merged layout.
+    """
+    return _digest([['pivot', str(pivot_column)]] + [['column', str(col)] for col in columns])
+
+
+def _json_kind(value: Any) -> str:
+    """
+    Collapses a JSON value to list, object or scalar (None included), so a field
+    that is null one week and a string the next keeps the same fingerprint.
+    """
+    if isinstance(value, list):
+        return 'list'
+    if isinstance(value, dict):
+        return 'object'
+    return 'scalar'
+
+
+def json_fingerprint(data: Any) -> Optional[str]:
+    """
+    Fingerprints the top-level structure of a parsed JSON document.
+
+    Used before flattening, to recall the record path of a known layout. The
+    record path only depends on which keys hold lists, so values are reduced
+    to list/object/scalar.
+
+    Args:
+        data: The parsed JSON document.
+
+    Returns:
+        Optional[str]: Hex digest of the top-level keys and value kinds, or None
+        if the root is not an object (there is no record path to remember).
+    """
+    if not isinstance(data, dict):
+        return None
+    return _digest([[str(key), _json_kind(value)] for key, value in sorted(data.items())])
+
+
+class SchemaRegistry:
+    """
+    Local registry of confirmed choices for recurring source layouts.
+
+    Entries are keyed by fingerprint and may hold a 'pivot', 'selected_columns'
+    and 'loader_options' (e.g. {'record_path': 'tasks'}). On a hit, the wizard
+    applies them directly instead of running the detection heuristics.
+    The registry is a JSON file so it survives restarts and is shared by sessions
+    and worker processes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Location of the registry file. Defaults to default_registry_path().
+        """
+        self.path = path or default_registry_path()
+        self._entries = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError):
+            # A corrupt or unreadable registry only costs the shortcut; heuristics still run
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def lookup(self, fingerprint: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the entry remembered for a fingerprint, or None.
+        """
+        if fingerprint is None:
+            return None
+        return self._entries.get(fingerprint)
+
+    def remember(self, fingerprint: Optional[str], **fields: Any) -> None:
+        """
+        Stores confirmed choices for a fingerprint and persists the registry.
+
+        Fields are merged into the existing entry; None values are ignored.
+
+        Args:
+            fingerprint: The layout fingerprint. None is ignored.
+            **fields: Values such as pivot, selected_columns or loader_options.
+        """
+        updates = {key: value for key, value in fields.items() if value is not None}
+        if fingerprint is None or not updates:
+            return
+
+        with _registry_lock:
+            # Re-read so entries written by other sessions or workers are kept
+            self._entries = self._read()
+            entry = dict(self._entries.get(fingerprint, {}))
+            entry.update(updates)
+            self._entries[fingerprint] = entry
+
+            directory = os.path.dirname(self.path) or '.'
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                # Read-only or full disk: keep the entry in memory, the wizard still works
+                pass
+
+
+def known_pivot_candidates(
+    registry: SchemaRegistry, dataframes: List[pd.DataFrame]
+) -> Optional[pd.DataFrame]:
+    """
+    Builds the pivot candidates table from the registry instead of scoring columns.
+
+    Applies only when every dataset's layout is known and they all agree on a
+    pivot present in each of them.
+
+    Args:
+        registry: The schema registry.
+        dataframes: The loaded datasets.
+
+    Returns:
+        Optional[pd.DataFrame]: A table shaped like calculate_pivot_score's output with
+        the remembered pivot first, or None if the heuristics must run.
+    """
+    if not dataframes:
+        return None
+
+    pivots = set()
+    for df in dataframes:
+        entry = registry.lookup(frame_fingerprint(df))
+        if entry is None or 'pivot' not in entry:
+            return None
+        pivots.add(entry['pivot'])
+
+    if len(pivots) != 1:
+        return None
+    pivot = pivots.pop()
+    if any(pivot not in df.columns for df in dataframes):
+        return None
+
+    # Keep the other columns selectable, in Super Schema order, without scoring them
+    other_columns = list(dict.fromkeys(
+        col for df in dataframes for col in df.columns if col != pivot
+    ))
+    rows = [{'Campo': pivot, 'Puntaje': 1.0, 'Evidencia': "Known layout: pivot confirmed in a previous session"}]
+    rows += [{'Campo': col, 'Puntaje': 0.0, 'Evidencia': "Not scored (known layout)"} for col in other_columns]
+    return pd.DataFrame(rows)
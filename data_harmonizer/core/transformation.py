@@ -1,13 +1,19 @@
 import pandas as pd
-from typing import List
+from typing import Callable, List, Optional
 
-def merge_datasets(dataframes: List[pd.DataFrame], pivot_column: str) -> pd.DataFrame:
+def merge_datasets(
+    dataframes: List[pd.DataFrame],
+    pivot_column: str,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> pd.DataFrame:
     """
     Merges a list of DataFrames into a single DataFrame using an iterative outer join.
     
     Args:
         dataframes: List of pd.DataFrame objects to merge.
         pivot_column: The common column name to join on.
+        progress_callback: Optional callable invoked as (merged_count, total) after each join.
+            It may raise to abort the merge (e.g. on job cancellation).
         
     Returns:
         pd.DataFrame: The merged result.
@@ -44,5 +50,8 @@ def merge_datasets(dataframes: List[pd.DataFrame], pivot_column: str) -> pd.Data
             how='outer', 
             suffixes=(None, suffix_right)
         )
+
+        if progress_callback is not None:
+            progress_callback(i + 1, len(dataframes))
         
     return result
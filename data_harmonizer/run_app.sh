@@ -33,7 +33,14 @@ if [ -d "$HOME/.streamlit/cache" ]; then
     rm -rf "$HOME/.streamlit/cache"
 fi
 
-# 5. Run Application
+# 5. Warm-up
+# Precompile bytecode so a cold start does not parse the sources, and let the
+# app start its worker pool (with pandas and parsers preloaded) on first load.
+echo "🔥 Precompiling application modules..."
+python -m compileall -q app.py core ui
+export DH_WARMUP="${DH_WARMUP:-1}"
+
+# 6. Run Application
 echo "=========================================="
 echo "▶️  Launching Data Harmonizer..."
 echo "=========================================="
@@ -0,0 +1,84 @@
+import unittest
+import importlib.util
+import json
+import subprocess
+import sys
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must only load once the stage needing them runs
+HEAVY_MODULES = ['pandas', 'pyarrow', 'openpyxl', 'xlsxwriter']
+
+HAS_STREAMLIT = importlib.util.find_spec('streamlit') is not None
+
+def _profile(module: str, preload: str = '') -> dict:
+    """
+    Imports a module in a fresh interpreter (after optional preload imports).
+
+    Returns:
+        dict: 'loaded' (heavy modules the import added), 'seconds' (its wall time)
+        and 'slowest' (top entries of the -X importtime profile, for failure messages).
+    """
+    code = (
+        "import sys, time, json\n"
+        f"{preload}\n"
+        f"before = {{m for m in {HEAVY_MODULES!r} if m in sys.modules}}\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "seconds = time.perf_counter() - start\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules and m not in before]\n"
+        "print(json.dumps({'loaded': loaded, 'seconds': seconds}))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    profile = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # Lines look like "import time:  self |  cumulative | name"
+    entries = []
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            entries.append((int(parts[1]), parts[2].strip()))
+    profile['slowest'] = sorted(entries, reverse=True)[:10]
+    return profile
+
+def _import_seconds(module: str) -> float:
+    return _profile(module)['seconds']
+
+class TestImportProfile(unittest.TestCase):
+    """Guards the startup path against eager imports of heavy dependencies."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Reference cost: what a startup module would pay if it imported pandas eagerly
+        cls.pandas_seconds = _import_seconds('pandas')
+
+    def assertLight(self, module: str, preload: str = ''):
+        profile = _profile(module, preload)
+        self.assertEqual(profile['loaded'], [], f"{module} loaded heavy modules; slowest: {profile['slowest']}")
+        self.assertLess(
+            profile['seconds'], self.pandas_seconds / 2,
+            f"{module} took {profile['seconds']:.3f}s to import; slowest: {profile['slowest']}"
+        )
+
+    def test_job_runner_is_light(self):
+        self.assertLight('core.jobs')
+
+    @unittest.skipUnless(HAS_STREAMLIT, "streamlit is not installed")
+    def test_ui_state_is_light(self):
+        # streamlit's own imports are not ours to defer; measure what ui.state adds
+        self.assertLight('ui.state', preload='import streamlit')
+
+    @unittest.skipUnless(HAS_STREAMLIT, "streamlit is not installed")
+    def test_ui_wizard_is_light(self):
+        self.assertLight('ui.wizard', preload='import streamlit')
+
+    @unittest.skipUnless(HAS_STREAMLIT, "streamlit is not installed")
+    def test_app_is_light(self):
+        self.assertLight('app', preload='import streamlit')
+
+if __name__ == '__main__':
+    unittest.main()
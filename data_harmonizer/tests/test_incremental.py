@@ -0,0 +1,99 @@
+import unittest
+import pandas as pd
+from io import BytesIO
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.incremental import HarmonizedResult, content_hash
+
+def _dataset(name, df, version=''):
+    return (name, content_hash(f"{name}{version}{df.to_json()}".encode('utf-8')), df)
+
+class TestHarmonizedResult(unittest.TestCase):
+
+    def setUp(self):
+        self.d1 = _dataset('a.csv', pd.DataFrame({'id': [1, 2, 3], 'status': ['x', 'y', 'z']}))
+        self.d2 = _dataset('b.csv', pd.DataFrame({'id': [2, 4], 'score': [20, 40]}))
+        self.d3 = _dataset('c.csv', pd.DataFrame({'id': [1, 5], 'score': [10, 50]}))
+
+    def assertSameResult(self, left, right):
+        pd.testing.assert_frame_equal(
+            left.data.sort_values('id').reset_index(drop=True),
+            right.data.sort_values('id').reset_index(drop=True),
+            check_dtype=False
+        )
+
+    def test_build_matches_merge(self):
+        result = HarmonizedResult.build([self.d1, self.d2, self.d3], 'id')
+        
+        self.assertEqual(result.data.columns.tolist(), ['id', 'status', 'score', 'score_file3'])
+        self.assertEqual(len(result.data), 5)
+
+    def test_append_matches_full_rebuild(self):
+        """Test that appending a new file gives the same result as merging everything again."""
+        base = HarmonizedResult.build([self.d1, self.d2], 'id')
+        
+        updated, summary = base.update([self.d1, self.d3])
+        
+        self.assertEqual(summary, {'added': ['c.csv'], 'replaced': [], 'unchanged': ['a.csv']})
+        self.assertSameResult(updated, HarmonizedResult.build([self.d1, self.d2, self.d3], 'id'))
+        # The original result is not modified
+        self.assertEqual(len(base.data), 4)
+
+    def test_replace_changed_file(self):
+        """Test that a changed file replaces its columns, drops its own keys and renames later suffixes."""
+        base = HarmonizedResult.build([self.d1, self.d2, self.d3], 'id')
+        d2_new = _dataset('b.csv', pd.DataFrame({'id': [3], 'status': ['w']}), version='v2')
+        
+        updated, summary = base.update([d2_new])
+        
+        self.assertEqual(summary['replaced'], ['b.csv'])
+        expected = HarmonizedResult.build([self.d1, d2_new, self.d3], 'id')
+        self.assertEqual(updated.data.columns.tolist(), ['id', 'status', 'status_file2', 'score'])
+        self.assertNotIn(4, updated.data['id'].tolist())
+        self.assertSameResult(updated, expected)
+
+    def test_duplicate_pivot_requires_rebuild(self):
+        """Test that duplicated keys are rejected instead of giving a wrong update."""
+        a = _dataset('a.csv', pd.DataFrame({'id': [1, 1, 2], 'x': ['p', 'q', 'r']}))
+        b = _dataset('b.csv', pd.DataFrame({'id': [1, 1, 3], 'y': ['s', 't', 'u']}))
+        b_new = _dataset('b.csv', pd.DataFrame({'id': [1, 3], 'y': ['v', 'w']}), version='v2')
+        base = HarmonizedResult.build([a, b], 'id')
+        
+        with self.assertRaises(ValueError):
+            base.update([b_new])
+        
+        unique_base = HarmonizedResult.build([self.d1], 'id')
+        with self.assertRaises(ValueError):
+            unique_base.update([b])
+
+    def test_parquet_roundtrip(self):
+        result = HarmonizedResult.build([self.d1, self.d2], 'id')
+        
+        loaded = HarmonizedResult.from_parquet(BytesIO(result.to_parquet_bytes()))
+        
+        self.assertEqual(loaded.pivot_column, 'id')
+        self.assertTrue(loaded.is_known(self.d2[1]))
+        self.assertSameResult(loaded, result)
+        updated, _ = loaded.update([self.d3])
+        self.assertSameResult(updated, HarmonizedResult.build([self.d1, self.d2, self.d3], 'id'))
+
+    def test_parquet_without_metadata(self):
+        buffer = BytesIO()
+        pd.DataFrame({'id': [1]}).to_parquet(buffer)
+        buffer.seek(0)
+        
+        with self.assertRaises(ValueError):
+            HarmonizedResult.from_parquet(buffer)
+
+    def test_missing_pivot(self):
+        base = HarmonizedResult.build([self.d1], 'id')
+        
+        with self.assertRaises(ValueError):
+            base.update([_dataset('d.csv', pd.DataFrame({'key': [1]}))])
+
+if __name__ == '__main__':
+    unittest.main()
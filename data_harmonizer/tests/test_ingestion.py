@@ -79,5 +79,18 @@ class TestJsonLoader(unittest.TestCase):
         # Verify metadata propagation works even for heuristic detection
         self.assertIn('meta_info', df.columns)
 
+    def test_configured_record_path(self):
+        """Test that a remembered record path overrides the heuristic."""
+        json_content = {
+            "tasks": [{"id": 1}],
+            "history": [{"event": "a"}, {"event": "b"}]
+        }
+        content_bytes = BytesIO(json.dumps(json_content).encode('utf-8'))
+        
+        df = JsonLoader(record_path="history").load(content_bytes, "layout.json")
+        
+        self.assertEqual(len(df), 2)
+        self.assertIn('event', df.columns)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,221 @@
+import unittest
+import tempfile
+import time
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.registry import SchemaRegistry
+from core.jobs import JobRunner, JobStatus, run_ingestion, run_merge, run_preview, run_snapshot, run_update
+
+
+def _wait(runner, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while runner.status(job_id) in (JobStatus.PENDING, JobStatus.RUNNING):
+        if time.monotonic() > deadline:
+            raise TimeoutError(job_id)
+        time.sleep(0.05)
+    return runner.status(job_id)
+
+
+def _slow_task(context, steps):
+    for i in range(steps):
+        context.report(i / steps, f"step {i}")
+        time.sleep(0.05)
+    return steps
+
+
+def _uninterruptible_task(context):
+    context.report(0.0, "started")
+    time.sleep(0.3)
+    return 'result'
+
+
+def _crashing_task(context):
+    # Simulates a worker killed by the OS (e.g. out of memory)
+    os._exit(1)
+
+
+class TestJobRunner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.runner = JobRunner(max_workers=2)
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.registry_path = os.path.join(cls.tmpdir.name, 'registry.json')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.runner.shutdown()
+        cls.tmpdir.cleanup()
+
+    def test_ingestion_job(self):
+        """Test that files are loaded and pivot candidates computed in a worker."""
+        files = [
+            ('a.csv', b'id,val\n1,a\n2,b\n'),
+            ('b.json', b'[{"id": 1, "score": 10}]'),
+        ]
+        job_id = self.runner.submit('load', run_ingestion, files, self.registry_path)
+
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.DONE)
+        loaded_data, candidates, hashes, layouts = self.runner.result(job_id)
+        self.assertEqual(sorted(loaded_data), ['a.csv', 'b.json'])
+        self.assertEqual(sorted(hashes), ['a.csv', 'b.json'])
+        self.assertFalse(layouts['a.csv']['known'])
+        self.assertEqual(candidates.iloc[0]['Campo'], 'id')
+        self.assertEqual(self.runner.progress(job_id), (1.0, "Done"))
+
+    def test_merge_job(self):
+        """Test that the merge stage returns the merged result and pivot."""
+        df1 = pd.DataFrame({'id': [1, 2], 'val': ['a', 'b']})
+        df2 = pd.DataFrame({'id': [2, 3], 'score': [20, 30]})
+        job_id = self.runner.submit('merge', run_merge, [('a', 'h1', df1), ('b', 'h2', df2)], 'id')
+
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.DONE)
+        result = self.runner.result(job_id)
+        self.assertEqual(result.pivot_column, 'id')
+        self.assertEqual(len(result.data), 3)
+        self.assertEqual(self.runner.stage(job_id), 'merge')
+
+    def test_preview_job(self):
+        """Test that the preview view is built in a worker and returned."""
+        df = pd.DataFrame({'id': range(5), 'val': list('abcde')})
+        job_id = self.runner.submit('preview', run_preview, df)
+
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.DONE)
+        view = self.runner.result(job_id)
+        self.assertEqual(view.num_rows, 5)
+        self.assertEqual(view.page(1, 2)['val'].tolist(), ['c', 'd'])
+
+    def test_update_job_skips_known_files(self):
+        """Test that an incremental update only parses files with new content."""
+        files = [('a.csv', b'id,val\n1,a\n2,b\n'), ('b.csv', b'id,score\n2,20\n')]
+        load_id = self.runner.submit('load', run_ingestion, files, self.registry_path)
+        _wait(self.runner, load_id)
+        loaded_data, _, hashes, _ = self.runner.result(load_id)
+        merge_id = self.runner.submit('merge', run_merge, [(n, hashes[n], loaded_data[n]) for n, _ in files], 'id')
+        _wait(self.runner, merge_id)
+        snapshot_id = self.runner.submit('snapshot', run_snapshot, self.runner.result(merge_id))
+        _wait(self.runner, snapshot_id)
+
+        new_files = files + [('c.csv', b'id,extra\n3,x\n')]
+        job_id = self.runner.submit('update', run_update, self.runner.result(snapshot_id), new_files)
+
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.DONE)
+        result, summary = self.runner.result(job_id)
+        self.assertEqual(summary['added'], ['c.csv'])
+        self.assertEqual(sorted(summary['unchanged']), ['a.csv', 'b.csv'])
+        self.assertEqual(sorted(result.data['id'].tolist()), [1, 2, 3])
+
+    def test_ingestion_uses_registry(self):
+        """Test that a known layout reuses its record path and pivot without heuristics."""
+        content = b'{"batch": "b1", "items": [{"ref": "x", "n": 1}], "extra": [1, 2, 3]}'
+        registry = SchemaRegistry(os.path.join(self.tmpdir.name, 'known.json'))
+        first_id = self.runner.submit('load', run_ingestion, [('a.json', content)], registry.path)
+        _wait(self.runner, first_id)
+        loaded_data, _, _, layouts = self.runner.result(first_id)
+        self.assertEqual(layouts['a.json']['loader_options'], {'record_path': 'items'})
+
+        # Remember a different record path and the pivot, as the wizard does on confirmation
+        registry.remember(layouts['a.json']['source_fingerprint'], loader_options={'record_path': 'extra'})
+        job_id = self.runner.submit('load', run_ingestion, [('a.json', content)], registry.path)
+        _wait(self.runner, job_id)
+        loaded_data, _, _, layouts = self.runner.result(job_id)
+        self.assertTrue(layouts['a.json']['known'])
+        self.assertEqual(len(loaded_data['a.json']), 3)
+
+        # A remembered path that no longer applies falls back to detection and is not "known"
+        registry.remember(layouts['a.json']['source_fingerprint'], loader_options={'record_path': 'gone'})
+        job_id = self.runner.submit('load', run_ingestion, [('a.json', content)], registry.path)
+        _wait(self.runner, job_id)
+        loaded_data, _, _, layouts = self.runner.result(job_id)
+        self.assertFalse(layouts['a.json']['known'])
+        self.assertEqual(layouts['a.json']['loader_options'], {'record_path': 'items'})
+
+        registry.remember(layouts['a.json']['fingerprint'], pivot='batch')
+        job_id = self.runner.submit('load', run_ingestion, [('a.json', content)], registry.path)
+        _wait(self.runner, job_id)
+        _, candidates, _, _ = self.runner.result(job_id)
+        self.assertEqual(candidates.iloc[0]['Campo'], 'batch')
+        self.assertIn('Known layout', candidates.iloc[0]['Evidencia'])
+
+    def test_failed_job(self):
+        """Test that loader errors surface as a failed job instead of raising."""
+        job_id = self.runner.submit('load', run_ingestion, [('bad.txt', b'x')], self.registry_path)
+
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.FAILED)
+        self.assertIn('Unsupported file type', self.runner.error(job_id))
+        with self.assertRaises(RuntimeError):
+            self.runner.result(job_id)
+
+    def test_cancel_running_job(self):
+        """Test that a running job stops at its next progress report."""
+        job_id = self.runner.submit('load', _slow_task, 200)
+        while self.runner.progress(job_id)[1] == "Queued":
+            time.sleep(0.01)
+
+        self.assertTrue(self.runner.cancel(job_id))
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.CANCELLED)
+
+    def test_warm_up_does_not_register_jobs(self):
+        runner = JobRunner(max_workers=1)
+        try:
+            runner.warm_up()
+            job_id = runner.submit('merge', run_merge, [('a', 'h1', pd.DataFrame({'id': [1]}))], 'id')
+            self.assertEqual(_wait(runner, job_id), JobStatus.DONE)
+            self.assertEqual(list(runner._jobs), [job_id])
+        finally:
+            runner.shutdown()
+
+    def test_cancel_uninterruptible_job_drops_result(self):
+        """Test that a job finishing after a cancel request is reported as cancelled."""
+        job_id = self.runner.submit('export', _uninterruptible_task)
+        while self.runner.progress(job_id)[1] != "started":
+            time.sleep(0.01)
+
+        self.assertTrue(self.runner.cancel(job_id))
+        self.assertEqual(_wait(self.runner, job_id), JobStatus.CANCELLED)
+        with self.assertRaises(RuntimeError):
+            self.runner.result(job_id)
+        self.runner.discard(job_id)
+        self.assertNotIn(job_id, self.runner._cancelled)
+
+    def test_expired_jobs_are_evicted(self):
+        """Test that uncollected results are released once the TTL has passed."""
+        runner = JobRunner(max_workers=1, result_ttl=0.0)
+        try:
+            job_id = runner.submit('load', _slow_task, 1)
+            _wait(runner, job_id)
+            time.sleep(0.01)
+            runner.evict_expired()
+            self.assertFalse(runner.has_job(job_id))
+        finally:
+            runner.shutdown()
+
+    def test_pool_recovers_from_dead_worker(self):
+        """Test that jobs still run after a worker process died."""
+        runner = JobRunner(max_workers=1)
+        try:
+            crashed = runner.submit('merge', _crashing_task)
+            self.assertEqual(_wait(runner, crashed), JobStatus.FAILED)
+
+            job_id = runner.submit('load', _slow_task, 1)
+            self.assertEqual(_wait(runner, job_id), JobStatus.DONE)
+            self.assertEqual(runner.result(job_id), 1)
+        finally:
+            runner.shutdown()
+
+    def test_discard(self):
+        job_id = self.runner.submit('load', _slow_task, 1)
+        _wait(self.runner, job_id)
+        self.runner.discard(job_id)
+
+        self.assertFalse(self.runner.has_job(job_id))
+        with self.assertRaises(KeyError):
+            self.runner.status(job_id)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.preview import ResultView
+
+class TestResultView(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': range(10),
+            'val': ['a', 'b', None, 'a', 'c', 'b', 'a', None, 'c', 'a'],
+        })
+
+    def test_pagination(self):
+        """Test that pages are windows of the result with positional index."""
+        view = ResultView(self.df)
+        
+        self.assertEqual(view.num_rows, 10)
+        self.assertEqual(view.num_pages(4), 3)
+        
+        last_page = view.page(2, 4)
+        self.assertEqual(last_page['id'].tolist(), [8, 9])
+        self.assertEqual(last_page.index.tolist(), [8, 9])
+        
+        with self.assertRaises(ValueError):
+            view.page(3, 4)
+
+    def test_column_summary(self):
+        view = ResultView(self.df)
+        summary = view.column_summary('val')
+        
+        self.assertEqual(summary['Null %'], 20.0)
+        self.assertEqual(summary['Distinct'], 3)
+        self.assertEqual(summary['Min'], 'a')
+        self.assertEqual(summary['Max'], 'c')
+        # Cached per view
+        self.assertIs(view.column_summary('val'), summary)
+
+    def test_mixed_types_fallback(self):
+        """Test that mixed object columns (common after outer merges) are shown as text."""
+        df = pd.DataFrame({'id': [1, 2, 3], 'mixed': [1, 'two', None]})
+        view = ResultView(df)
+        
+        mixed = view.page(0, 10)['mixed']
+        self.assertEqual(mixed.iloc[:2].tolist(), ['1', 'two'])
+        self.assertTrue(pd.isna(mixed.iloc[2]))
+        self.assertEqual(view.column_summary('mixed')['Null %'], round(100 / 3, 2))
+
+    def test_select_shares_summaries(self):
+        view = ResultView(self.df)
+        summary = view.column_summary('val')
+        narrowed = view.select(['val'])
+        
+        self.assertEqual(narrowed.columns, ['val'])
+        self.assertIs(narrowed.column_summary('val'), summary)
+        with self.assertRaises(KeyError):
+            narrowed.column_summary('id')
+
+if __name__ == '__main__':
+    unittest.main()
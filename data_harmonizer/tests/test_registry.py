@@ -0,0 +1,107 @@
+import unittest
+import tempfile
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.registry import SchemaRegistry, frame_fingerprint, json_fingerprint, known_pivot_candidates, selection_fingerprint
+from core.transformation import merge_datasets
+
+class TestFingerprints(unittest.TestCase):
+
+    def test_frame_fingerprint_ignores_rows(self):
+        """Test that the fingerprint depends on the schema only."""
+        df1 = pd.DataFrame({'id': [1, 2], 'val': ['a', 'b']})
+        df2 = pd.DataFrame({'id': [3], 'val': ['c']})
+        
+        self.assertEqual(frame_fingerprint(df1), frame_fingerprint(df2))
+
+    def test_frame_fingerprint_detects_dtype_change(self):
+        df1 = pd.DataFrame({'id': [1], 'val': ['a']})
+        df2 = pd.DataFrame({'id': ['1'], 'val': ['a']})
+        
+        self.assertNotEqual(frame_fingerprint(df1), frame_fingerprint(df2))
+
+    def test_frame_fingerprint_ignores_inference_drift(self):
+        """Test that an int column read as float because of a blank keeps the same layout."""
+        week1 = pd.DataFrame({'id': [1, 2], 'qty': [3, 4]})
+        week2 = pd.DataFrame({'id': [1, 2], 'qty': [3, None]})
+        
+        self.assertEqual(frame_fingerprint(week1), frame_fingerprint(week2))
+
+    def test_selection_fingerprint_ignores_dtypes(self):
+        """Test that the step-3 key survives outer-join dtype changes of the same layouts."""
+        left = pd.DataFrame({'id': [1, 2], 'val': ['a', 'b']})
+        full = merge_datasets([left, pd.DataFrame({'id': [1, 2], 'score': [10, 20]})], 'id')
+        partial = merge_datasets([left, pd.DataFrame({'id': [2, 3], 'score': [20, 30]})], 'id')
+        text = merge_datasets([left, pd.DataFrame({'id': [1, 2], 'score': ['10', '20']})], 'id')
+        
+        # Same layouts: int score when keys overlap fully, float once NaN is introduced
+        self.assertNotEqual(full['score'].dtype, partial['score'].dtype)
+        self.assertEqual(selection_fingerprint('id', full.columns), selection_fingerprint('id', partial.columns))
+        self.assertNotEqual(selection_fingerprint('id', full.columns), selection_fingerprint('val', full.columns))
+        # The per-file layout fingerprint still tells a text column from a numeric one
+        self.assertNotEqual(frame_fingerprint(full), frame_fingerprint(text))
+
+    def test_json_fingerprint(self):
+        self.assertEqual(
+            json_fingerprint({'tasks': [1], 'project': 'a'}),
+            json_fingerprint({'project': 'b', 'tasks': [2, 3]})
+        )
+        self.assertIsNone(json_fingerprint([{'id': 1}]))
+
+    def test_json_fingerprint_ignores_scalar_drift(self):
+        """Test that scalar type changes keep the layout, but a key turning into a list does not."""
+        week1 = {'tasks': [{'id': 1}], 'owner': None, 'version': 1, 'meta': {'a': 1}}
+        week2 = {'tasks': [{'id': 2}], 'owner': 'ana', 'version': 1.5, 'meta': {'b': 'x'}}
+        
+        self.assertEqual(json_fingerprint(week1), json_fingerprint(week2))
+        self.assertNotEqual(json_fingerprint(week1), json_fingerprint(dict(week1, owner=['ana'])))
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'nested', 'registry.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_remember_persists_and_merges(self):
+        registry = SchemaRegistry(self.path)
+        registry.remember('fp1', pivot='id')
+        registry.remember('fp1', selected_columns=['id', 'val'], loader_options=None)
+        
+        reloaded = SchemaRegistry(self.path)
+        self.assertEqual(reloaded.lookup('fp1'), {'pivot': 'id', 'selected_columns': ['id', 'val']})
+        self.assertIsNone(reloaded.lookup('unknown'))
+        self.assertIsNone(reloaded.lookup(None))
+
+    def test_corrupt_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        
+        self.assertIsNone(SchemaRegistry(self.path).lookup('fp1'))
+
+    def test_known_pivot_candidates(self):
+        """Test that a pivot is only reused when every layout agrees on it."""
+        registry = SchemaRegistry(self.path)
+        df1 = pd.DataFrame({'id': [1], 'val': ['a']})
+        df2 = pd.DataFrame({'id': [1], 'score': [1.5]})
+        
+        registry.remember(frame_fingerprint(df1), pivot='id')
+        self.assertIsNone(known_pivot_candidates(registry, [df1, df2]))
+        
+        registry.remember(frame_fingerprint(df2), pivot='id')
+        candidates = known_pivot_candidates(registry, [df1, df2])
+        self.assertEqual(candidates['Campo'].tolist(), ['id', 'val', 'score'])
+        
+        registry.remember(frame_fingerprint(df2), pivot='score')
+        self.assertIsNone(known_pivot_candidates(registry, [df1, df2]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -54,6 +54,15 @@ class TestTransformation(unittest.TestCase):
         self.assertEqual(row['status_file2'], 'pending')
         self.assertEqual(row['status_file3'], 'closed')
 
+    def test_progress_callback(self):
+        """Test that progress is reported after each join."""
+        dfs = [pd.DataFrame({'id': [1], f'c{i}': [i]}) for i in range(3)]
+        calls = []
+        
+        merge_datasets(dfs, 'id', progress_callback=lambda done, total: calls.append((done, total)))
+        
+        self.assertEqual(calls, [(2, 3), (3, 3)])
+
     def test_empty_input(self):
         result = merge_datasets([], 'id')
         self.assertTrue(result.empty)
@@ -1,6 +1,12 @@
 import streamlit as st
-import pandas as pd
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from core.jobs import get_runner
+
+# pandas/pyarrow are only needed once data exists; keep them off the startup path
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.preview import ResultView
+    from core.incremental import HarmonizedResult
 
 class SessionManager:
     """
@@ -13,6 +19,16 @@ class SessionManager:
     KEY_MERGED_DF = 'merged_df'
     KEY_PIVOT_CANDIDATES = 'pivot_candidates'
     KEY_SELECTED_PIVOT = 'selected_pivot'
+    KEY_ACTIVE_JOB = 'active_job'
+    KEY_EXPORT = 'export_bytes'
+    KEY_RESULT_VIEW = 'result_view'
+    KEY_CONTENT_HASHES = 'content_hashes'
+    KEY_HARMONIZED = 'harmonized_result'
+    KEY_SNAPSHOT = 'snapshot_bytes'
+    KEY_LAYOUTS = 'source_layouts'
+
+    # Query parameter used to find a background job again after a browser refresh
+    QUERY_JOB = 'job'
 
     def __init__(self):
         """Initialize session state with defaults if not present."""
@@ -31,6 +47,28 @@ class SessionManager:
         if self.KEY_SELECTED_PIVOT not in st.session_state:
             st.session_state[self.KEY_SELECTED_PIVOT] = None
 
+        if self.KEY_ACTIVE_JOB not in st.session_state:
+            # A refresh wipes session_state but keeps the URL, so recover the job id from it
+            st.session_state[self.KEY_ACTIVE_JOB] = st.query_params.get(self.QUERY_JOB)
+
+        if self.KEY_EXPORT not in st.session_state:
+            st.session_state[self.KEY_EXPORT] = None
+
+        if self.KEY_RESULT_VIEW not in st.session_state:
+            st.session_state[self.KEY_RESULT_VIEW] = None
+
+        if self.KEY_CONTENT_HASHES not in st.session_state:
+            st.session_state[self.KEY_CONTENT_HASHES] = {}
+
+        if self.KEY_HARMONIZED not in st.session_state:
+            st.session_state[self.KEY_HARMONIZED] = None
+
+        if self.KEY_SNAPSHOT not in st.session_state:
+            st.session_state[self.KEY_SNAPSHOT] = None
+
+        if self.KEY_LAYOUTS not in st.session_state:
+            st.session_state[self.KEY_LAYOUTS] = {}
+
     @property
     def current_step(self) -> int:
         return st.session_state[self.KEY_STEP]
@@ -42,31 +80,87 @@ class SessionManager:
         if st.session_state[self.KEY_STEP] > 1:
             st.session_state[self.KEY_STEP] -= 1
 
+    def go_to_step(self, step: int):
+        st.session_state[self.KEY_STEP] = step
+
     def reset(self):
         """Resets the wizard to the beginning."""
+        job_id = self.get_active_job()
+        if job_id is not None:
+            get_runner().discard(job_id)
+            self.clear_active_job()
         st.session_state[self.KEY_STEP] = 1
         st.session_state[self.KEY_RAW_DATA] = {}
         st.session_state[self.KEY_MERGED_DF] = None
         st.session_state[self.KEY_PIVOT_CANDIDATES] = None
         st.session_state[self.KEY_SELECTED_PIVOT] = None
+        st.session_state[self.KEY_EXPORT] = None
+        st.session_state[self.KEY_RESULT_VIEW] = None
+        st.session_state[self.KEY_CONTENT_HASHES] = {}
+        st.session_state[self.KEY_HARMONIZED] = None
+        st.session_state[self.KEY_SNAPSHOT] = None
+        st.session_state[self.KEY_LAYOUTS] = {}
         st.rerun()
 
-    def set_dataframes(self, dfs: Dict[str, pd.DataFrame]):
+    def set_dataframes(self, dfs: Dict[str, 'pd.DataFrame']):
         st.session_state[self.KEY_RAW_DATA] = dfs
 
-    def get_dataframes(self) -> Dict[str, pd.DataFrame]:
+    def get_dataframes(self) -> Dict[str, 'pd.DataFrame']:
         return st.session_state[self.KEY_RAW_DATA]
 
-    def set_merged_df(self, df: pd.DataFrame):
+    def set_content_hashes(self, hashes: Dict[str, str]):
+        st.session_state[self.KEY_CONTENT_HASHES] = hashes
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        return st.session_state[self.KEY_CONTENT_HASHES]
+
+    def set_layouts(self, layouts: Dict[str, Dict[str, Any]]):
+        st.session_state[self.KEY_LAYOUTS] = layouts
+
+    def get_layouts(self) -> Dict[str, Dict[str, Any]]:
+        return st.session_state[self.KEY_LAYOUTS]
+
+    def set_harmonized(self, result: 'HarmonizedResult'):
+        """Stores the full merged result (with provenance) and shows its data in the wizard."""
+        st.session_state[self.KEY_HARMONIZED] = result
+        st.session_state[self.KEY_SNAPSHOT] = None
+        self.set_merged_df(result.data)
+        self.set_selected_pivot(result.pivot_column)
+
+    def get_harmonized(self) -> Optional['HarmonizedResult']:
+        return st.session_state[self.KEY_HARMONIZED]
+
+    def set_snapshot(self, data: Optional[bytes]):
+        st.session_state[self.KEY_SNAPSHOT] = data
+
+    def get_snapshot(self) -> Optional[bytes]:
+        return st.session_state[self.KEY_SNAPSHOT]
+
+    def set_merged_df(self, df: 'pd.DataFrame', view: Optional['ResultView'] = None):
+        """
+        Stores the merged result.
+
+        Args:
+            df: The merged DataFrame.
+            view: Optional preview already matching df; otherwise one is prepared on request.
+        """
         st.session_state[self.KEY_MERGED_DF] = df
+        st.session_state[self.KEY_RESULT_VIEW] = view
 
-    def get_merged_df(self) -> Optional[pd.DataFrame]:
+    def get_merged_df(self) -> Optional['pd.DataFrame']:
         return st.session_state[self.KEY_MERGED_DF]
+
+    def set_result_view(self, view: 'ResultView'):
+        st.session_state[self.KEY_RESULT_VIEW] = view
+
+    def get_result_view(self) -> Optional['ResultView']:
+        """Returns the windowed preview of the merged result, or None until one was prepared."""
+        return st.session_state[self.KEY_RESULT_VIEW]
     
-    def set_pivot_candidates(self, df: pd.DataFrame):
+    def set_pivot_candidates(self, df: 'pd.DataFrame'):
         st.session_state[self.KEY_PIVOT_CANDIDATES] = df
         
-    def get_pivot_candidates(self) -> Optional[pd.DataFrame]:
+    def get_pivot_candidates(self) -> Optional['pd.DataFrame']:
         return st.session_state[self.KEY_PIVOT_CANDIDATES]
     
     def set_selected_pivot(self, pivot: str):
@@ -74,3 +168,21 @@ class SessionManager:
         
     def get_selected_pivot(self) -> Optional[str]:
         return st.session_state[self.KEY_SELECTED_PIVOT]
+
+    def set_active_job(self, job_id: str):
+        st.session_state[self.KEY_ACTIVE_JOB] = job_id
+        st.query_params[self.QUERY_JOB] = job_id
+
+    def get_active_job(self) -> Optional[str]:
+        return st.session_state[self.KEY_ACTIVE_JOB]
+
+    def clear_active_job(self):
+        st.session_state[self.KEY_ACTIVE_JOB] = None
+        if self.QUERY_JOB in st.query_params:
+            del st.query_params[self.QUERY_JOB]
+
+    def set_export(self, data: Optional[bytes]):
+        st.session_state[self.KEY_EXPORT] = data
+
+    def get_export(self) -> Optional[bytes]:
+        return st.session_state[self.KEY_EXPORT]
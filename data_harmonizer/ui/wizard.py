@@ -1,11 +1,122 @@
+import time
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-from core.ingestion import CsvLoader, ExcelLoader, JsonLoader
-from core.heuristics import calculate_pivot_score
-from core.transformation import merge_datasets
+from typing import Any
+from core.jobs import (
+    JobStatus, get_runner, run_ingestion, run_merge, run_update, run_export, run_snapshot, run_preview
+)
 from ui.state import SessionManager
 
+# Seconds between reruns while a background job is in flight
+JOB_POLL_INTERVAL = 0.5
+
+PREVIEW_PAGE_SIZES = [25, 50, 100, 500]
+
+def _apply_job_result(session: SessionManager, stage: str, result: Any):
+    """Stores the result of a finished job and moves the wizard to the matching step."""
+    if stage == 'load':
+        loaded_data, candidates, hashes, layouts = result
+        session.set_dataframes(loaded_data)
+        session.set_pivot_candidates(candidates)
+        session.set_content_hashes(hashes)
+        session.set_layouts(layouts)
+        session.go_to_step(2)
+    elif stage == 'merge':
+        session.set_harmonized(result)
+        session.set_export(None)
+        session.go_to_step(3)
+    elif stage == 'update':
+        harmonized, summary = result
+        session.set_harmonized(harmonized)
+        session.set_export(None)
+        st.toast(
+            f"Added {len(summary['added'])}, replaced {len(summary['replaced'])}, "
+            f"skipped {len(summary['unchanged'])} unchanged file(s)."
+        )
+        session.go_to_step(3)
+    elif stage == 'export':
+        session.set_export(result)
+        session.go_to_step(4)
+    elif stage == 'snapshot':
+        session.set_snapshot(result)
+        session.go_to_step(4)
+    elif stage == 'preview':
+        session.set_result_view(result)
+
+def render_active_job(session: SessionManager):
+    """
+    Polls the session's background job and renders its progress.
+
+    While the job is in flight the script reruns periodically and the current
+    step is not rendered. Finished results are applied to the session, even
+    when the job was picked up again after a browser refresh.
+    """
+    job_id = session.get_active_job()
+    if job_id is None:
+        return
+
+    runner = get_runner()
+    if not runner.has_job(job_id):
+        # The server restarted or the job was discarded; nothing to resume
+        session.clear_active_job()
+        return
+
+    status = runner.status(job_id)
+    if status in (JobStatus.PENDING, JobStatus.RUNNING):
+        fraction, message = runner.progress(job_id)
+        st.progress(fraction, text=message or "Waiting for a free worker...")
+        if st.button("Cancel"):
+            runner.cancel(job_id)
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    elif status == JobStatus.DONE:
+        _apply_job_result(session, runner.stage(job_id), runner.result(job_id))
+        runner.discard(job_id)
+        session.clear_active_job()
+        st.rerun()
+    elif status == JobStatus.FAILED:
+        st.error(f"{runner.stage(job_id).capitalize()} failed: {runner.error(job_id)}")
+    else:
+        st.warning("The job was cancelled.")
+
+    runner.discard(job_id)
+    session.clear_active_job()
+
+def render_preview(session: SessionManager, key: str):
+    """
+    Renders a paginated preview of the merged result and on-demand column summaries.
+
+    The Arrow view is only built when the user asks for it, in a worker. Only the
+    current page is sent to the browser; summaries are computed the first time a
+    column is requested and cached with the result.
+
+    Args:
+        session: The session holding the merged result.
+        key: Widget key prefix, so the preview can appear on several steps.
+    """
+    view = session.get_result_view()
+    if view is None:
+        if st.button("Load preview", key=f"{key}_load_preview"):
+            job_id = get_runner().submit('preview', run_preview, session.get_merged_df())
+            session.set_active_job(job_id)
+            st.rerun()
+        return
+
+    size_col, page_col = st.columns(2)
+    page_size = size_col.selectbox("Rows per page", PREVIEW_PAGE_SIZES, key=f"{key}_page_size")
+    num_pages = view.num_pages(page_size)
+    page_number = page_col.number_input(
+        f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, step=1, key=f"{key}_page"
+    )
+    st.dataframe(view.page(int(page_number) - 1, page_size), use_container_width=True)
+
+    summary_cols = st.multiselect("Column summaries", view.columns, key=f"{key}_summary_cols")
+    if summary_cols:
+        summary_df = view.summaries(summary_cols)
+        # Min/Max mix types across columns; render them as text
+        summary_df['Min'] = summary_df['Min'].map(lambda v: '' if v is None else str(v))
+        summary_df['Max'] = summary_df['Max'].map(lambda v: '' if v is None else str(v))
+        st.dataframe(summary_df, hide_index=True, use_container_width=True)
+
 def render_upload_step(session: SessionManager):
     """Step 1: Upload Files"""
     st.header("1. Data Ingestion")
@@ -17,62 +128,31 @@ def render_upload_step(session: SessionManager):
         accept_multiple_files=True
     )
     
+    base_file = st.file_uploader(
+        "Previous result (optional)",
+        type=['parquet'],
+        help="A Parquet snapshot from an earlier run. Only new or changed files are merged into it."
+    )
+    
     if uploaded_files:
         if st.button("Analyze Files"):
-            loaded_data = {}
-            all_dfs = []
-            
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            try:
-                for i, file in enumerate(uploaded_files):
-                    status_text.text(f"Processing {file.name}...")
-                    
-                    if file.name.endswith('.csv'):
-                        loader = CsvLoader()
-                    elif file.name.endswith(('.xlsx', '.xls')):
-                        loader = ExcelLoader()
-                    elif file.name.endswith('.json'):
-                        loader = JsonLoader()
-                    else:
-                        st.error(f"Unsupported file type: {file.name}")
-                        continue
-                        
-                    # Reset pointer just in case
-                    file.seek(0)
-                    df = loader.load(file, file.name)
-                    loaded_data[file.name] = df
-                    all_dfs.append(df)
-                    
-                    progress_bar.progress((i + 1) / len(uploaded_files))
-                
-                if all_dfs:
-                    session.set_dataframes(loaded_data)
-                    
-                    # Calculate heuristics on concatenated schema (or just the first/all depending on strategy)
-                    # Strategy: Concatenate all columns to see the "Super Schema" for heuristic calculation is a bit tricky if they don't align.
-                    # Better Strategy: Heuristics run on the dataset that "leads" or aggregated view. 
-                    # Re-reading prompt: "The system aggregates all column headers... forms a single Super Schema... Heuristic Brain evaluates each column".
-                    # Implementation: Create a dummy DF with all columns from all DFs (outer join of schemas essentially)
-                    # Efficient way: Just get all unique column names, check if they exist in DFs and getting stats is complex if not merged.
-                    # Simplified practical approach for now: Run heuristics on *each* DF and average scores OR assume common schema.
-                    # *Correction per architecture*: "Super Schema". Let's concat all frames (outer) to get full column set and stats.
-                    
-                    status_text.text("Calculating automated pivot suggestions...")
-                    # Concat for analysis only (might be heavy, but safe for small internal tool)
-                    super_df = pd.concat(all_dfs, ignore_index=True, sort=False)
-                    
-                    candidates = calculate_pivot_score(super_df)
-                    session.set_pivot_candidates(candidates)
-                    session.next_step()
-                    st.rerun()
-                    
-            except Exception as e:
-                st.error(f"Error processing files: {str(e)}")
-            finally:
-                progress_bar.empty()
-                status_text.empty()
+            # Deferred: the loaders pull in pandas, which the first page does not need
+            from core.ingestion import get_loader
+
+            unsupported = [file.name for file in uploaded_files if get_loader(file.name) is None]
+            for name in unsupported:
+                st.error(f"Unsupported file type: {name}")
+
+            # Ship raw bytes to the worker; UploadedFile objects are not picklable
+            files = [(file.name, file.getvalue()) for file in uploaded_files if file.name not in unsupported]
+            if files:
+                if base_file is not None:
+                    # The pivot is known from the snapshot, so go straight to the merge
+                    job_id = get_runner().submit('update', run_update, base_file.getvalue(), files)
+                else:
+                    job_id = get_runner().submit('load', run_ingestion, files)
+                session.set_active_job(job_id)
+                st.rerun()
 
 def render_pivot_check(session: SessionManager):
     """Step 2: Pivot Validation"""
@@ -81,6 +161,10 @@ def render_pivot_check(session: SessionManager):
     
     candidates = session.get_pivot_candidates()
     
+    known_files = [name for name, layout in session.get_layouts().items() if layout['known']]
+    if known_files:
+        st.caption(f"Known layouts (settings reused from the registry): {', '.join(known_files)}")
+    
     if candidates is not None and not candidates.empty:
         # Get top candidate
         top_candidate = candidates.iloc[0]['Campo']
@@ -111,35 +195,55 @@ def render_pivot_check(session: SessionManager):
                     st.warning(f"⚠️ Duplicate values found for '{selected_col}' in file: {name}")
         
         if st.button("Confirm and Unify"):
-            try:
-                # Perform the Merge
-                dfs = list(data_map.values())
-                merged_df = merge_datasets(dfs, selected_col)
-                
-                session.set_merged_df(merged_df)
-                session.set_selected_pivot(selected_col)
-                session.next_step()
-                st.rerun()
-            except Exception as e:
-                st.error(f"Merge failed: {str(e)}")
+            from core.registry import SchemaRegistry
+
+            # Remember the confirmed choices so these layouts skip the heuristics next time
+            registry = SchemaRegistry()
+            for layout in session.get_layouts().values():
+                registry.remember(layout['fingerprint'], pivot=selected_col)
+                if layout['loader_options']:
+                    registry.remember(layout['source_fingerprint'], loader_options=layout['loader_options'])
+            
+            # Perform the Merge in a worker process
+            hashes = session.get_content_hashes()
+            datasets = [(name, hashes[name], df) for name, df in data_map.items()]
+            job_id = get_runner().submit('merge', run_merge, datasets, selected_col)
+            session.set_active_job(job_id)
+            st.rerun()
 
 def render_schema_selector(session: SessionManager):
     """Step 3: Schema Curation"""
     st.header("3. Schema Selection")
     st.markdown("Select the columns you want to include in the final report.")
     
+    import pandas as pd
+    from core.registry import SchemaRegistry, selection_fingerprint
+
     merged_df = session.get_merged_df()
     
     if merged_df is not None:
         # Create a helper dataframe for the editor
         all_cols = merged_df.columns.tolist()
+        registry = SchemaRegistry()
+        fingerprint = selection_fingerprint(session.get_selected_pivot(), all_cols)
         
         # Default: Keep provided pivot, drop suffixes if redundant? Na, let user choose.
-        # Initialize selection state if not exists in session (to keep checks between reloads)
-        if 'column_config' not in st.session_state:
+        # Initialize selection state once per merged result (to keep checks between reloads)
+        if (
+            'column_config' not in st.session_state
+            or st.session_state['column_config']['Column Name'].tolist() != all_cols
+        ):
+            # A known merged layout starts from the previously confirmed selection
+            known = registry.lookup(fingerprint)
+            if known is not None and 'selected_columns' in known:
+                remembered = set(known['selected_columns'])
+                include = [str(col) in remembered for col in all_cols]
+                st.info("Known layout: restored your previous column selection.")
+            else:
+                include = [True] * len(all_cols)
             st.session_state['column_config'] = pd.DataFrame({
                 'Column Name': all_cols,
-                'Include': [True] * len(all_cols)
+                'Include': include
             })
             
         edited_config = st.data_editor(
@@ -157,15 +261,24 @@ def render_schema_selector(session: SessionManager):
         
         st.session_state['column_config'] = edited_config
         
+        with st.expander("Preview merged data"):
+            render_preview(session, key="curate")
+        
         if st.button("Generate Final Report"):
             # Filter columns
             selected_cols = edited_config[edited_config['Include']]['Column Name'].tolist()
             final_df = merged_df[selected_cols]
+            registry.remember(fingerprint, selected_columns=[str(col) for col in selected_cols])
             
             # Store final result temporarily or just pass to next step?
             # We can just update the merged_df in session or create a new key.
             # Updating merged_df is cleaner for step 4.
-            session.set_merged_df(final_df)
+            # Narrow the existing preview instead of converting the data again
+            view = session.get_result_view()
+            if view is not None:
+                view = view.select([str(col) for col in selected_cols])
+            session.set_merged_df(final_df, view=view)
+            session.set_export(None)
             session.next_step()
             st.rerun()
 
@@ -175,27 +288,44 @@ def render_download(session: SessionManager):
     st.success("Data harmonization complete! Your consolidated report is ready.")
     
     final_df = session.get_merged_df()
+    export_data = session.get_export()
     
     if final_df is not None:
         st.metric(label="Total Rows", value=len(final_df))
         st.metric(label="Total Columns", value=len(final_df.columns))
         
-        st.dataframe(final_df.head())
+        render_preview(session, key="export")
         
-        # Buffer for Excel
-        buffer = BytesIO()
-        try:
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                final_df.to_excel(writer, index=False, sheet_name='Clean Data')
-            
-            st.download_button(
-                label="Download Excel Report (.xlsx)",
-                data=buffer.getvalue(),
-                file_name="harmonized_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        except Exception as e:
-            st.error(f"Error generating Excel: {str(e)}")
+        if export_data is None and st.button("Generate Excel Report"):
+            # Excel generation runs in a worker; the active job poller stores the bytes
+            job_id = get_runner().submit('export', run_export, final_df)
+            session.set_active_job(job_id)
+            st.rerun()
+
+    if export_data is not None:
+        st.download_button(
+            label="Download Excel Report (.xlsx)",
+            data=export_data,
+            file_name="harmonized_data.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        
+    harmonized = session.get_harmonized()
+    snapshot_data = session.get_snapshot()
+    if harmonized is not None:
+        st.caption("Keep a Parquet snapshot to merge next week's files into this result without re-uploading everything.")
+        if snapshot_data is None and st.button("Generate Parquet Snapshot"):
+            job_id = get_runner().submit('snapshot', run_snapshot, harmonized)
+            session.set_active_job(job_id)
+            st.rerun()
+    
+    if snapshot_data is not None:
+        st.download_button(
+            label="Download Parquet Snapshot (.parquet)",
+            data=snapshot_data,
+            file_name="harmonized_result.parquet",
+            mime="application/octet-stream"
+        )
         
-        if st.button("Start New Session"):
-            session.reset()
+    if st.button("Start New Session"):
+        session.reset()